@@ -7,7 +7,7 @@
 import os
 import sys
 import unittest
-from typing import Dict, List, Union
+from typing import Dict, FrozenSet, List, Union
 
 
 #
@@ -19,24 +19,83 @@ from typing import Dict, List, Union
 # should gradually remove tests from this list as we get them passing on Windows.
 #
 TEST_DISABLED: Dict[str, Union[List[str], bool]] = {}
+
+# Classes where every test is skipped on Windows, one per line.  The first
+# group is from the main integration test binary, the second group is from the
+# hg integration test binary.  This is parsed into a frozenset below; keeping
+# it as a plain newline-delimited string avoids building ~60 dict entries that
+# would all map to True.
+_WIN32_DISABLED_CLASSES: str = """
+basic_test.PosixTest
+chown_test.ChownTest
+clone_test.CloneFakeEdenFSTestAdHoc
+clone_test.CloneFakeEdenFSTestManaged
+clone_test.CloneTestHg
+config_test.ConfigTest
+corrupt_overlay_test.CorruptOverlayTestDefault
+debug_getpath_test.DebugGetPathTestHg
+edenclient_test.EdenClientTestHg
+facebook.buck.buck_test.BuckTestHg
+fsck_test.FsckTestDefault
+fsck_test.FsckTestNoEdenfs
+fsck.basic_snapshot_tests.Basic20210712Test
+health_test.HealthOfFakeEdenFSTestAdHoc
+health_test.HealthOfFakeEdenFSTestManaged
+info_test.InfoTestHg
+linux_cgroup_test.LinuxCgroupTest
+materialized_query_test.MaterializedQueryTestHg
+mmap_test.MmapTestHg
+mount_test.MountTestHg
+oexcl_test.OpenExclusiveTestHg
+patch_test.PatchTestHg
+rage_test.RageTestDefault
+rc_test.RCTestHg
+remount_test.RemountTestHg
+rename_test.RenameTestHg
+restart_test.RestartTestAdHoc
+restart_test.RestartTestManaged
+sed_test.SedTestHg
+service_log_test.ServiceLogFakeEdenFSTestAdHoc
+service_log_test.ServiceLogFakeEdenFSTestManaged
+service_log_test.ServiceLogRealEdenFSTest
+setattr_test.SetAttrTestHg
+snapshot.test_snapshots.InfraTests
+snapshot.test_snapshots.Test
+stale_inode_test.StaleInodeTestHgNFS
+stale_test.StaleTestDefault
+start_test.DirectInvokeTest
+start_test.StartFakeEdenFSTestAdHoc
+start_test.StartFakeEdenFSTestManaged
+start_test.StartTest
+start_test.StartWithRepoTestHg
+stats_test.FUSEStatsTest
+stop_test.AutoStopTest
+stop_test.StopTestAdHoc
+stop_test.StopTestManaged
+takeover_test.TakeoverRocksDBStressTestHg
+takeover_test.TakeoverTestHg
+takeover_test.TakeoverTestNoNFSServerHg
+unixsocket_test.UnixSocketTestHg
+userinfo_test.UserInfoTest
+xattr_test.XattrTestHg
+
+hg.debug_clear_local_caches_test.DebugClearLocalCachesTestTreeOnly
+hg.debug_get_parents.DebugGetParentsTestTreeOnly
+hg.debug_hg_dirstate_test.DebugHgDirstateTestTreeOnly
+hg.diff_test.DiffTestTreeOnly
+hg.status_deadlock_test.StatusDeadlockTestTreeOnly
+"""
+
 if sys.platform == "win32":
     # Note that on Windows we also exclude some test source files entirely
     # in CMakeLists.txt, for tests that never make sense to run on Windows.
-    TEST_DISABLED: Dict[str, Union[List[str], None]] = {
+    TEST_DISABLED = {
         #
         # Test classes from the main integration test binary
         #
         "basic_test.BasicTest": [
             "test_symlinks",
         ],
-        "basic_test.PosixTest": True,
-        "chown_test.ChownTest": True,
-        "clone_test.CloneFakeEdenFSTestAdHoc": True,
-        "clone_test.CloneFakeEdenFSTestManaged": True,
-        "clone_test.CloneTestHg": True,
-        "config_test.ConfigTest": True,
-        "corrupt_overlay_test.CorruptOverlayTestDefault": True,
-        "debug_getpath_test.DebugGetPathTestHg": True,
         "doteden_test.DotEdenTestHg": [
             "test_mkdir_fails",  # ProjectedFS doesn't allow refusing directory creation
             "test_create_file_fails",  # ProjectedFS doesn't allow refusing file creation
@@ -44,66 +103,19 @@ if sys.platform == "win32":
             "test_symlink_fails",  # ProjectedFS doesn't allow refusing symlink creation
             "test_chown_fails",  # chown doesn't exist on Windows
         ],
-        "edenclient_test.EdenClientTestHg": True,
-        "facebook.buck.buck_test.BuckTestHg": True,
-        "fsck_test.FsckTestDefault": True,
-        "fsck_test.FsckTestNoEdenfs": True,
-        "fsck.basic_snapshot_tests.Basic20210712Test": True,
-        "health_test.HealthOfFakeEdenFSTestAdHoc": True,
-        "health_test.HealthOfFakeEdenFSTestManaged": True,
-        "info_test.InfoTestHg": True,
-        "linux_cgroup_test.LinuxCgroupTest": True,
-        "materialized_query_test.MaterializedQueryTestHg": True,
-        "mmap_test.MmapTestHg": True,
-        "mount_test.MountTestHg": True,
-        "oexcl_test.OpenExclusiveTestHg": True,
-        "patch_test.PatchTestHg": True,
         "persistence_test.PersistenceTestHg": [
             "test_does_not_reuse_inode_numbers_after_cold_restart"
         ],
-        "rage_test.RageTestDefault": True,
-        "rc_test.RCTestHg": True,
         "redirect_test.RedirectTestHg": ["test_disallow_bind_mount_outside_repo"],
-        "remount_test.RemountTestHg": True,
-        "rename_test.RenameTestHg": True,
-        "restart_test.RestartTestAdHoc": True,
-        "restart_test.RestartTestManaged": True,
-        "sed_test.SedTestHg": True,
-        "service_log_test.ServiceLogFakeEdenFSTestAdHoc": True,
-        "service_log_test.ServiceLogFakeEdenFSTestManaged": True,
-        "service_log_test.ServiceLogRealEdenFSTest": True,
-        "setattr_test.SetAttrTestHg": True,
-        "snapshot.test_snapshots.InfraTests": True,
-        "snapshot.test_snapshots.Test": True,
-        "stale_test.StaleTestDefault": True,
-        "start_test.DirectInvokeTest": True,
-        "start_test.StartFakeEdenFSTestAdHoc": True,
-        "start_test.StartFakeEdenFSTestManaged": True,
-        "start_test.StartTest": True,
-        "start_test.StartWithRepoTestHg": True,
-        "stats_test.FUSEStatsTest": True,
-        "stop_test.AutoStopTest": True,
-        "stop_test.StopTestAdHoc": True,
-        "stop_test.StopTestManaged": True,
-        "takeover_test.TakeoverRocksDBStressTestHg": True,
-        "takeover_test.TakeoverTestHg": True,
-        "takeover_test.TakeoverTestNoNFSServerHg": True,
         "thrift_test.ThriftTestHg": [
             "test_get_sha1_throws_for_symlink",
             "test_pid_fetch_counts",
             "test_unload_free_inodes",
             "test_unload_thrift_api_accepts_single_dot_as_root",
         ],
-        "unixsocket_test.UnixSocketTestHg": True,
-        "userinfo_test.UserInfoTest": True,
-        "xattr_test.XattrTestHg": True,
         #
         # Test classes from the hg integration test binary
         #
-        "hg.debug_clear_local_caches_test.DebugClearLocalCachesTestTreeOnly": True,
-        "hg.debug_get_parents.DebugGetParentsTestTreeOnly": True,
-        "hg.debug_hg_dirstate_test.DebugHgDirstateTestTreeOnly": True,
-        "hg.diff_test.DiffTestTreeOnly": True,
         "hg.grep_test.GrepTestTreeOnly": [
             "test_grep_directory_from_root",
             "test_grep_directory_from_subdirectory",
@@ -116,7 +128,6 @@ if sys.platform == "win32":
             "test_rm_modified_file_permissions",
         ],
         "hg.split_test.SplitTestTreeOnly": ["test_split_one_commit_into_two"],
-        "hg.status_deadlock_test.StatusDeadlockTestTreeOnly": True,
         "hg.status_test.StatusTestTreeOnly": [
             # TODO: Opening a file with O_TRUNC inside an EdenFS mount fails on Windows
             "test_partial_truncation_after_open_modifies_file",
@@ -131,7 +142,6 @@ if sys.platform == "win32":
             # TODO: A \r\n is used
             "test_mount_state_during_unmount_with_in_progress_checkout",
         ],
-        "stale_inode_test.StaleInodeTestHgNFS": True,
     }
 elif sys.platform.startswith("linux") and not os.path.exists("/etc/redhat-release"):
     # The ChownTest.setUp() code tries to look up the "nobody" group, which doesn't
@@ -230,21 +240,39 @@ try:
 except ImportError:
     pass
 
+# Lookup tables derived from TEST_DISABLED once at import time.  Classes that
+# are entirely disabled go into a frozenset, and the per-method skip lists are
+# normalized to frozensets, so each check below is a single hashed lookup.
+_DISABLED_CLASSES: FrozenSet[str] = frozenset(
+    name for name, disabled in TEST_DISABLED.items() if disabled is True
+)
+if sys.platform == "win32":
+    _DISABLED_CLASSES |= frozenset(_WIN32_DISABLED_CLASSES.split())
+_DISABLED_METHODS: Dict[str, FrozenSet[str]] = {
+    name: frozenset(methods)
+    for name, methods in TEST_DISABLED.items()
+    if not isinstance(methods, bool)
+}
+
+# Evaluated once so the common no-skips case is a single boolean test.
+_HAVE_DISABLED_TESTS: bool = bool(_DISABLED_CLASSES or _DISABLED_METHODS)
+
 
 def is_class_disabled(class_name: str) -> bool:
-    class_skipped = TEST_DISABLED.get(class_name)
-    if class_skipped is None:
+    if not _HAVE_DISABLED_TESTS:
         return False
-    if isinstance(class_skipped, bool):
-        assert class_skipped is True
-        # All classes in the test are skipped
-        return True
-    return False
+    return class_name in _DISABLED_CLASSES
 
 
 def is_method_disabled(class_name: str, method_name: str) -> bool:
-    method_skipped = TEST_DISABLED.get(class_name)
-    if method_skipped is None:
+    if not _HAVE_DISABLED_TESTS:
         return False
-    assert isinstance(method_skipped, list)
-    return method_name in method_skipped
+    methods = _DISABLED_METHODS.get(class_name)
+    return methods is not None and method_name in methods
+
+
+def get_disabled_methods(class_name: str) -> FrozenSet[str]:
+    """Get all disabled test methods for a class in a single lookup."""
+    if not _HAVE_DISABLED_TESTS:
+        return frozenset()
+    return _DISABLED_METHODS.get(class_name, frozenset())
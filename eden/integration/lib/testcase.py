@@ -6,6 +6,7 @@
 
 import configparser
 import errno
+import functools
 import hashlib
 import inspect
 import logging
@@ -482,6 +483,14 @@ class EdenRepoTest(EdenTestCase):
         )
 
 
+@functools.lru_cache(maxsize=None)
+def _strip_eden_integration_prefix(name: str) -> str:
+    prefix = "eden.integration."
+    if name.startswith(prefix):
+        name = name[len(prefix) :]
+    return name
+
+
 def _replicate_test(
     caller_scope: Dict[str, Any],
     replicate: Callable[..., Iterable[Tuple[str, Type[unittest.TestCase]]]],
@@ -496,13 +505,7 @@ def _replicate_test(
         new_class.__qualname__ = name
         new_class.__module__ = test_class.__module__
 
-        def strip_eden_integration_prefix(name: str) -> str:
-            prefix = "eden.integration."
-            if name.startswith(prefix):
-                name = name[len(prefix) :]
-            return name
-
-        module = strip_eden_integration_prefix(f"{new_class.__module__}")
+        module = _strip_eden_integration_prefix(new_class.__module__)
 
         # Allow skipping individual replicated classes, or whole classes.
         class_names = [f"{module}.{name}", f"{module}.{test_class.__name__}"]
@@ -518,13 +521,15 @@ def _replicate_test(
             continue
 
         # We also want to be able to skip methods pre replication
-        for class_name in class_names:
+        disabled_methods = frozenset().union(
+            *(skip.get_disabled_methods(class_name) for class_name in class_names)
+        )
+        if disabled_methods:
             for method in dir(new_class):
-                if method.startswith("test_"):
-                    if skip.is_method_disabled(class_name, method):
-                        # A None method will not be listed by unittest causing
-                        # the test to never be executed.
-                        setattr(new_class, method, None)
+                if method.startswith("test_") and method in disabled_methods:
+                    # A None method will not be listed by unittest causing
+                    # the test to never be executed.
+                    setattr(new_class, method, None)
 
         # Add the class to our caller's scope
         caller_scope[name] = new_class
@@ -38,6 +38,12 @@ Configs::
     # Server-side option.  Maximum acceptable bundle size in megabytes.
     maxbundlesize = 500
 
+    # Server-side option. Directory where incoming bundles are spilled to
+    # temporary files while being processed. Pointing this at a tmpfs such
+    # as /dev/shm avoids one full disk write per push. Defaults to the
+    # system temporary directory.
+    tempbundledir = /dev/shm
+
     # Which compression algorithm to use for infinitepush bundles.
     bundlecompression = ZS
 
@@ -91,10 +97,9 @@ def reposetup(ui, repo):
 def uisetup(ui):
     # remotenames circumvents the default push implementation entirely, so make
     # sure we load after it so that we wrap it.
-    order = extensions._order
-    order.remove("infinitepush")
-    order.append("infinitepush")
-    extensions._order = order
+    extensions._order = [ext for ext in extensions._order if ext != "infinitepush"] + [
+        "infinitepush"
+    ]
     # Register bundleparts capabilities and handlers.
     bundleparts.uisetup(ui)
 
@@ -117,7 +122,7 @@ def _deltaparent(orig, self, revlog, rev, p1, p2, prev):
 
 
 def _createbundler(ui, repo, other):
-    bundler = bundle2.bundle20(ui, bundle2.bundle2caps(other))
+    bundler = bundle2.bundle20(ui, bundleparts._peerbundle2caps(other))
     compress = ui.config("infinitepush", "bundlecompression", "UN")
     bundler.setcompression(compress)
     # Disallow pushback because we want to avoid taking repo locks.
@@ -25,6 +25,19 @@ from edenscm.i18n import _
 from . import bookmarks, constants, server
 
 
+def _peerbundle2caps(peer):
+    """bundle2.bundle2caps(peer), cached on the peer object.
+
+    Capability parsing walks the peer's capability list each time, and a
+    single push consults it several times; the peer's capabilities do not
+    change over its lifetime."""
+    caps = getattr(peer, "_infinitepush_b2caps", None)
+    if caps is None:
+        caps = bundle2.bundle2caps(peer)
+        peer._infinitepush_b2caps = caps
+    return caps
+
+
 def uisetup(ui) -> None:
     bundle2.capabilities[constants.scratchbranchparttype] = ()
     bundle2.capabilities[constants.scratchbookmarksparttype] = ()
@@ -46,7 +59,7 @@ def _exchangesetup() -> None:
         if "changesets" in pushop.stepsdone or not scratchpush:
             return
 
-        if constants.scratchbranchparttype not in bundle2.bundle2caps(pushop.remote):
+        if constants.scratchbranchparttype not in _peerbundle2caps(pushop.remote):
             return
 
         pushop.stepsdone.add("changesets")
@@ -89,7 +102,7 @@ def _exchangesetup() -> None:
 def getscratchbranchparts(
     repo, peer, outgoing, confignonforwardmove, ui, bookmark, create, bookmarknode=None
 ):
-    if constants.scratchbranchparttype not in bundle2.bundle2caps(peer):
+    if constants.scratchbranchparttype not in _peerbundle2caps(peer):
         raise error.Abort(
             _("no server support for %r") % constants.scratchbranchparttype
         )
@@ -148,7 +161,7 @@ def _getscratchbranchpartsimpl(
     if mutation.enabled(repo):
         entries = mutation.entriesfornodes(repo, outgoing.missing)
         if entries:
-            if constants.scratchmutationparttype not in bundle2.bundle2caps(peer):
+            if constants.scratchmutationparttype not in _peerbundle2caps(peer):
                 repo.ui.warn(
                     _("no server support for %r - skipping\n")
                     % constants.scratchmutationparttype
@@ -178,7 +191,7 @@ def _getscratchbranchpartsimpl(
 
 
 def getscratchbookmarkspart(peer, scratchbookmarks) -> bundlepart:
-    if constants.scratchbookmarksparttype not in bundle2.bundle2caps(peer):
+    if constants.scratchbookmarksparttype not in _peerbundle2caps(peer):
         raise error.Abort(
             _("no server support for %r") % constants.scratchbookmarksparttype
         )
@@ -246,13 +259,16 @@ def _bundlesetup() -> None:
         cgpart = bundle2.bundlepart("changegroup", data=part.read())
         cgpart.addparam("version", cgversion)
         bundler.addpart(cgpart)
-        buf = util.chunkbuffer(bundler.getchunks())
-
-        fd, bundlefile = tempfile.mkstemp()
+        fd, bundlefile = tempfile.mkstemp(
+            dir=op.repo.ui.config("infinitepush", "tempbundledir")
+        )
         try:
             try:
                 fp = util.fdopen(fd, "wb")
-                fp.write(buf.read())
+                # Write the bundler output straight to the file; re-buffering
+                # it through a chunkbuffer would just copy every chunk again.
+                for chunk in bundler.getchunks():
+                    fp.write(chunk)
             finally:
                 fp.close()
             server.storebundle(op, part.params, bundlefile)
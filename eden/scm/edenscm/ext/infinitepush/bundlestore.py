@@ -57,6 +57,41 @@ class filebundlestore(object):
 
         return filename
 
+    def write_fileobj(self, fileobj):
+        """Write bundle data from a file object without reading it all at once.
+
+        The data is streamed to a temporary file while being hashed, then moved
+        into place, so peak memory stays bounded regardless of bundle size.
+        Returns the same key as write()."""
+        hasher = hashlib.sha1()
+        tempf = NamedTemporaryFile(dir=self.storepath, delete=False)
+        try:
+            while True:
+                data = fileobj.read(1024 * 1024)
+                if not data:
+                    break
+                hasher.update(data)
+                tempf.write(data)
+            tempf.close()
+
+            filename = hasher.hexdigest()
+            dirpath = self._dirpath(filename)
+            if not os.path.exists(dirpath):
+                os.makedirs(dirpath)
+            # os.replace overwrites an existing key on all platforms, matching
+            # write(); os.rename would fail on Windows if two pushes raced to
+            # store identical content.
+            os.replace(tempf.name, self._filepath(filename))
+        except Exception:
+            tempf.close()
+            try:
+                os.unlink(tempf.name)
+            except OSError:
+                pass
+            raise
+
+        return filename
+
     def read(self, key):
         try:
             f = open(self._filepath(key), "rb")
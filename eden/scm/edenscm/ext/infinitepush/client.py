@@ -43,11 +43,12 @@ configitem("infinitepush", "httpbookmarks", default=True)
 
 def extsetup(ui) -> None:
     entry = extensions.wrapcommand(commands.table, "push", _push)
-    # Don't add the 'to' arg if it already exists
-    if not any(a for a in entry[1] if a[1] == "to"):
+    # Don't add args that already exist
+    existingargs = {a[1] for a in entry[1]}
+    if "to" not in existingargs:
         entry[1].append(("", "to", "", _("push revs to this bookmark")))
 
-    if not any(a for a in entry[1] if a[1] == "non-forward-move"):
+    if "non-forward-move" not in existingargs:
         entry[1].append(
             (
                 "",
@@ -57,7 +58,7 @@ def extsetup(ui) -> None:
             )
         )
 
-    if not any(a for a in entry[1] if a[1] == "create"):
+    if "create" not in existingargs:
         entry[1].append(("", "create", None, _("create a new remote bookmark")))
 
     entry[1].append(
@@ -94,11 +95,13 @@ def extsetup(ui) -> None:
     # to avoid generation of both parts.
     partorder = exchange.b2partsgenorder
     index = partorder.index("changeset")
-    if constants.pushrebaseparttype in partorder:
+    try:
         index = min(index, partorder.index(constants.pushrebaseparttype))
-    partorder.insert(
-        index, partorder.pop(partorder.index(constants.scratchbranchparttype))
-    )
+    except ValueError:
+        # pushrebase is not loaded
+        pass
+    scratchpart = partorder.pop(partorder.index(constants.scratchbranchparttype))
+    partorder.insert(index, scratchpart)
 
 
 def _push(orig, ui, repo, dest=None, *args, **opts):
@@ -15,6 +15,25 @@ def isserver(ui):
     return ui.configbool("infinitepush", "server")
 
 
+_matchercache = {}
+
+
+def getstringmatcher(pattern):
+    """Return a cached match function for the given pattern.
+
+    util.stringmatcher may compile a regex, and a busy server matches the
+    same bookmark patterns over and over in listkeys and lookup handlers,
+    so compile each pattern only once."""
+    matcher = _matchercache.get(pattern)
+    if matcher is None:
+        if len(_matchercache) > 1000:
+            # Patterns come from client requests, so keep the cache bounded.
+            _matchercache.clear()
+        _, _, matcher = util.stringmatcher(pattern)
+        _matchercache[pattern] = matcher
+    return matcher
+
+
 def reposetup(ui, repo):
     repo._scratchbranchmatcher = scratchbranchmatcher(ui)
 
@@ -70,7 +89,7 @@ class scratchbranchmatcher(object):
     def __init__(self, ui):
         scratchbranchpat = ui.config("infinitepush", "branchpattern")
         if scratchbranchpat:
-            _, _, matchfn = util.stringmatcher(scratchbranchpat)
+            matchfn = getstringmatcher(scratchbranchpat)
         else:
             matchfn = lambda x: False
         self._matchfn = matchfn
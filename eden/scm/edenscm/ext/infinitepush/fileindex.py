@@ -17,6 +17,8 @@ import re
 from edenscm import error, pycompat, util
 from edenscm.i18n import _
 
+from . import common
+
 
 if pycompat.iswindows:
 
@@ -52,6 +54,14 @@ class fileindex(object):
         self._bookmarkmap = os.path.join(root, "bookmarkmap")
         self._metadatamap = os.path.join(root, "nodemetadatamap")
         self._lock = None
+        # Lookup handlers tend to probe the same nodes in back-to-back
+        # wireproto calls, so keep a small node->bundleid cache in front of
+        # the vfs reads.  Bookmarks are not cached: the index is shared with
+        # other server processes and scratch bookmarks move on every push, so
+        # a cached node could go stale.  A node's bundle mapping stays usable
+        # even if another process rebundles it, and misses are not cached so
+        # nodes added by other processes stay visible.
+        self._bundlecache = util.lrucachedict(1024)
 
     def __enter__(self):
         self._lock = self._repo.wlock()
@@ -64,9 +74,17 @@ class fileindex(object):
     def addbundle(self, bundleid, nodesctx, iscrossbackendsync=False):
         """Record a bundleid containing the given nodes."""
 
+        # All node entries live in the same directory, so set it up once
+        # instead of re-checking it for every node written.
+        vfs = self._repo.localvfs
+        dirname = _normalizepath(self._nodemap)
+        if not vfs.exists(dirname):
+            vfs.makedirs(dirname)
         for node in nodesctx:
-            nodepath = os.path.join(self._nodemap, node.hex())
-            self._write(nodepath, bundleid)
+            hexnode = node.hex()
+            nodepath = _normalizepath(os.path.join(self._nodemap, hexnode))
+            vfs.writeutf8(nodepath, bundleid)
+            self._bundlecache[hexnode] = bundleid
 
     def addbookmark(self, bookmark, node, _isbackup):
         """Record a bookmark pointing to a particular node."""
@@ -87,9 +105,27 @@ class fileindex(object):
 
     def getbundle(self, node):
         """Get the bundleid for a bundle that contains the given node."""
+        if node in self._bundlecache:
+            return self._bundlecache[node]
         nodepath = os.path.join(self._nodemap, node)
         bundleid = self._read(nodepath)
-        return pycompat.decodeutf8(bundleid) if bundleid is not None else None
+        if bundleid is None:
+            return None
+        bundleid = pycompat.decodeutf8(bundleid)
+        self._bundlecache[node] = bundleid
+        return bundleid
+
+    def getbundles(self, nodes):
+        """Get the bundleids for all of the given nodes in a single request.
+
+        Returns a dict of {node: bundleid} covering the nodes that are known
+        to the index.  Nodes that are not known are omitted."""
+        results = {}
+        for node in nodes:
+            bundleid = self.getbundle(node)
+            if bundleid is not None:
+                results[node] = bundleid
+        return results
 
     def getnodebyprefix(self, hashprefix):
         """Get the node that matches the given hash prefix.
@@ -102,7 +138,7 @@ class fileindex(object):
             return None
 
         files = vfs.listdir(self._nodemap)
-        nodefiles = list(filter(lambda n: n.startswith(hashprefix), files))
+        nodefiles = [n for n in files if n.startswith(hashprefix)]
 
         if not nodefiles:
             return None
@@ -124,6 +160,18 @@ class fileindex(object):
         value = self._read(bookmarkpath)
         return pycompat.decodeutf8(value) if value is not None else None
 
+    def getnodes(self, bookmarks):
+        """Get the nodes for all of the given bookmarks in a single request.
+
+        Returns a dict of {bookmark: node} covering the bookmarks that exist.
+        Bookmarks that do not exist are omitted."""
+        results = {}
+        for bookmark in bookmarks:
+            node = self.getnode(bookmark)
+            if node is not None:
+                results[bookmark] = node
+        return results
+
     def getbookmarks(self, pattern):
         """Get all bookmarks that match the pattern."""
         return sorted(self._listbookmarks(pattern))
@@ -136,7 +184,7 @@ class fileindex(object):
     def _listbookmarks(self, pattern):
         if pattern.endswith("*"):
             pattern = "re:^" + re.escape(pattern[:-1]) + ".*"
-        kind, pat, matcher = util.stringmatcher(pattern)
+        matcher = common.getstringmatcher(pattern)
         prefixlen = len(self._bookmarkmap) + 1
         for dirpath, _dirs, books in self._repo.localvfs.walk(self._bookmarkmap):
             for book in books:
@@ -159,7 +207,11 @@ class fileindex(object):
     def _read(self, path):
         vfs = self._repo.localvfs
         path = _normalizepath(path)
-        if not vfs.exists(path):
+        # Bookmarks are stored as files in nested directories, so a lookup of
+        # a bookmark that is a path-prefix of another (e.g. "scratch/joe" when
+        # "scratch/joe/feature" exists) names a directory; treat it as absent
+        # rather than trying to read it.
+        if not vfs.isfile(path):
             return None
         return vfs.read(path)
 
@@ -7,6 +7,7 @@ import contextlib
 import functools
 import os
 import random
+import re
 import socket
 import subprocess
 import tempfile
@@ -31,7 +32,10 @@ from edenscm import (
 )
 from edenscm.i18n import _, _n, _x
 
-from . import constants
+from . import common, constants
+
+
+_maybehash = re.compile(r"^[a-f0-9]+$").search
 
 
 def extsetup(ui):
@@ -109,11 +113,27 @@ def localrepolistkeys(orig, self, namespace, patterns=None):
         # restored in the same order after a pullbackup. See T24417531
         results = util.sortdict()
         bookmarks = orig(self, namespace)
+        # Plain bookmark names (no wildcard and no 're:'/'literal:' matcher
+        # prefix) can only ever match themselves, so resolve them all with
+        # one batched index request instead of a full bookmark listing per
+        # pattern.  Anything else may match arbitrary names and still needs
+        # the index listing.
+        def _isplainname(pattern):
+            return not pattern.endswith("*") and not pattern.startswith(
+                ("re:", "literal:")
+            )
+
+        exactnodes = index.getnodes([p for p in patterns if _isplainname(p)])
         for pattern in patterns:
-            results.update(index.getbookmarks(pattern))
             if pattern.endswith("*"):
+                results.update(index.getbookmarks(pattern))
                 pattern = "re:^" + pattern[:-1] + ".*"
-            kind, pat, matcher = util.stringmatcher(pattern)
+            elif _isplainname(pattern):
+                if pattern in exactnodes:
+                    results[pattern] = exactnodes[pattern]
+            else:
+                results.update(index.getbookmarks(pattern))
+            matcher = common.getstringmatcher(pattern)
             for bookmark, node in pycompat.iteritems(bookmarks):
                 if matcher(bookmark):
                     results[bookmark] = node
@@ -139,6 +159,10 @@ def _makelookupwrap(orig):
                 r = nodemod.hex(repo.lookup(localkey))
                 return "%s %s\n" % (1, r)
             except Exception as inst:
+                # Keys that aren't hex strings can't be a node hash prefix,
+                # so don't bother asking the index about them.
+                if not _maybehash(localkey):
+                    return "%s %s\n" % (0, str(inst))
                 try:
                     node = repo.bundlestore.index.getnodebyprefix(localkey)
                     if node:
@@ -162,9 +186,11 @@ def getbundlechunks(orig, repo, source, heads=None, bundlecaps=None, **kwargs):
     allbundlestocleanup = []
 
     cgversion = _getsupportedcgversion(repo, bundlecaps or [])
+    nodemap = repo.changelog.nodemap
+    headset = set(heads)
     try:
         for head in heads:
-            if head not in repo.changelog.nodemap:
+            if head not in nodemap:
                 if head not in nodestobundle:
                     newbundlefile = downloadbundle(repo, head)
                     bundlepath = "bundle:%s+%s" % (repo.root, newbundlefile)
@@ -182,7 +208,7 @@ def getbundlechunks(orig, repo, source, heads=None, bundlecaps=None, **kwargs):
                     for rev in bundlerevs:
                         node = cl.node(rev)
                         draftcommits.add(node)
-                        if node in heads:
+                        if node in headset:
                             bundleheads.add(node)
                             nodestobundle[node] = (
                                 bundlerepo,
@@ -288,14 +314,19 @@ def downloadbundle(repo, unknownbinhead):
     if bundleid is None:
         raise error.Abort("%s head is not known" % nodemod.hex(unknownbinhead))
     data = store.read(bundleid)
-    fp = None
-    fd, bundlefile = tempfile.mkstemp()
+    fd, bundlefile = tempfile.mkstemp(
+        dir=repo.ui.config("infinitepush", "tempbundledir")
+    )
     try:  # guards bundlefile
-        try:  # guards fp
-            fp = util.fdopen(fd, "wb")
-            fp.write(data)
+        try:  # guards fd
+            # The blob is already in memory, so write it straight through the
+            # fd instead of paying for a buffered Python file object.
+            view = memoryview(data)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
         finally:
-            fp.close()
+            os.close(fd)
     except Exception:
         try:
             os.unlink(bundlefile)
@@ -543,12 +574,16 @@ def processparts(orig, repo, op, unbundler):
 
     # If commits were sent, store them
     if cgparams:
-        buf = util.chunkbuffer(bundler.getchunks())
-        fd, bundlefile = tempfile.mkstemp()
+        fd, bundlefile = tempfile.mkstemp(
+            dir=repo.ui.config("infinitepush", "tempbundledir")
+        )
         try:
             try:
                 fp = util.fdopen(fd, "wb")
-                fp.write(buf.read())
+                # Write the bundler output straight to the file; re-buffering
+                # it through a chunkbuffer would just copy every chunk again.
+                for chunk in bundler.getchunks():
+                    fp.write(chunk)
             finally:
                 fp.close()
             storebundle(op, cgparams, bundlefile, iscrossbackendsync=iscrossbackendsync)
@@ -681,19 +716,23 @@ def storebundle(op, params, bundlefile, iscrossbackendsync=False):
             _n("pushing %s commit:\n", "pushing %s commits:\n", len(revs)) % len(revs)
         )
         maxoutput = 10
-        for i in range(0, min(len(revs), maxoutput)):
-            firstline = bundle[revs[i]].description().split("\n")[0][:50]
-            op.repo.ui.warn(_x("    %s  %s\n") % (revs[i], firstline))
+        for ctx in revs[:maxoutput]:
+            firstline = ctx.description().partition("\n")[0][:50]
+            op.repo.ui.warn(_x("    %s  %s\n") % (ctx, firstline))
 
         if len(revs) > maxoutput + 1:
             op.repo.ui.warn(_x("    ...\n"))
-            firstline = bundle[revs[-1]].description().split("\n")[0][:50]
-            op.repo.ui.warn(_x("    %s  %s\n") % (revs[-1], firstline))
+            lastctx = revs[-1]
+            firstline = lastctx.description().partition("\n")[0][:50]
+            op.repo.ui.warn(_x("    %s  %s\n") % (lastctx, firstline))
 
-        nodesctx = [bundle[rev] for rev in revs]
-        inindex = lambda rev: bool(index.getbundle(bundle[rev].hex()))
+        # _getrevs already returns contexts; no need to look them up again.
+        nodesctx = revs
         if bundleheads:
-            newheadscount = sum(not inindex(rev) for rev in bundleheads)
+            # Ask the index about all heads at once rather than issuing one
+            # lookup per head.
+            headnodes = [bundle[rev].hex() for rev in bundleheads]
+            newheadscount = len(headnodes) - len(index.getbundles(headnodes))
         else:
             newheadscount = 0
         # If there's a bookmark specified, the bookmarked node should also be
@@ -719,8 +758,7 @@ def storebundle(op, params, bundlefile, iscrossbackendsync=False):
                     raise error.Abort(error_msg % (bundlesize,))
 
                 with open(bundlefile, "rb") as f:
-                    bundledata = f.read()
-                    key = store.write(bundledata)
+                    key = store.write_fileobj(f)
 
         with logservicecall(log, "index", newheadscount=newheadscount), index:
             if key:
@@ -737,7 +775,7 @@ def storebundle(op, params, bundlefile, iscrossbackendsync=False):
             "infinitepush", "fillmetadatabranchpattern", ""
         )
         if bookmark and fillmetadatabranchpattern:
-            __, __, matcher = util.stringmatcher(fillmetadatabranchpattern)
+            matcher = common.getstringmatcher(fillmetadatabranchpattern)
             if matcher(bookmark):
                 _asyncsavemetadata(op.repo.root, [ctx.hex() for ctx in nodesctx])
     except Exception as e:
@@ -762,8 +800,14 @@ def _getrevs(bundle, oldnode, force, bookmark):
         return revs
 
     # Fast forward update
-    if oldnode in bundle and list(bundle.set("bundle() & %s::", oldnode)):
-        return revs
+    if oldnode in bundle:
+        # Common case: the bundle is rooted at the old bookmark tip, making
+        # every pushed commit a descendant of it.  Check the first rev's
+        # parents before paying for a full revset evaluation.
+        if revs and any(p.hex() == oldnode for p in revs[0].parents()):
+            return revs
+        if list(bundle.set("bundle() & %s::", oldnode)):
+            return revs
 
     # Forced non-fast forward update
     if force: